@@ -5,16 +5,67 @@ Integrated Intraday Stock Analysis Suite
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta, date
 import csv
 import os
-from threading import Thread
+import time
+import queue
+import random
+from threading import Thread, Lock, Semaphore, get_ident
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy code paths are used without it
+    njit = None
+
+# yfinance (and curl_cffi) are imported on first use by load_yfinance()
+yf = None
+curl_requests = None
+YFRateLimitError = None
+YFTickerMissingError = None
+
 DEFAULT_CSV = "stock_universe.csv"
+DEFAULT_SYMBOLS = ("AAPL", "MSFT", "GOOGL", "TSLA")  # Seeded when no universe CSV exists
 MAX_DAYS_1M = 8  # Yahoo Finance limit for 1-minute data
+MARKET_OPEN = datetime.strptime("09:30", "%H:%M").time()  # Regular session bounds (exchange time)
+MARKET_CLOSE = datetime.strptime("16:00", "%H:%M").time()
+EXCHANGE_TZ = "America/New_York"  # Timezone of the sessions above, for symbols with no bars yet
+SESSION_SETTLE = timedelta(minutes=15)  # Wait after the close before treating a session as final
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]  # Bar columns the tabs read
+FETCH_BATCH_SIZE = 20  # Symbols per yf.download call
+FETCH_WORKERS = 4  # Batches downloaded concurrently
+FETCH_RETRIES = 4  # Attempts per Yahoo request while it is rate limited
+FETCH_BACKOFF = 1.0  # Base delay in seconds, doubled after each rate-limited attempt
+FETCH_RATE = 5  # Max HTTP requests per second sent to Yahoo, across all threads
+SWING_SCAN_WINDOW = 64  # Bars examined per vectorized step when looking for the next swing
+# Row background for values above / below / within the +/- threshold band
+THRESHOLD_COLORS = {1: "#dcfce7", -1: "#fee2e2", 0: "#fef3c7"}
+HISTORY_CACHE_SIZE = 512  # Downloads kept in memory between runs
+HISTORY_CACHE_TTL = 60  # Seconds before bars that include today are refetched
+HISTORY_DISK_CACHE_DIR = os.path.join(".cache", "bars")  # Closed days persisted between launches
+QUEUE_POLL_MS = 100  # How often tabs drain results posted by their worker thread
+QUEUE_DRAIN_BATCH = 50  # Max results rendered per drain so the UI stays responsive
+MARKDOWN_SPAN_RE = re.compile(r"\*\*([^*]+)\*\*|`([^`]+)`")  # **bold** and `code` spans in help text
+
+# (symbol, start, end, interval) -> (fetch time, DataFrame)
+_history_cache = OrderedDict()
+# (symbol, interval) -> {(start, end), ...} of the entries above, to find wider downloads
+_history_ranges = {}
+_history_cache_lock = Lock()
+_yfinance_lock = Lock()
+_http_session = None
+_http_session_lock = Lock()
+# Caps concurrent downloads (batches or single-symbol retries) across every tab;
+# each yf.download fans out into its own threads, so the request rate itself is
+# bounded separately by wait_for_request_slot()
+_fetch_slots = Semaphore(FETCH_WORKERS)
+_request_rate_lock = Lock()
+_next_request_at = 0.0  # time.monotonic() before which no new request may start
 
 
 def is_trading_day(dt):
@@ -62,29 +113,679 @@ def format_date(dt):
     return str(dt)
 
 
+def split_ticker_frame(data, symbol):
+    """Extract one symbol's bars from a multi-ticker yf.download result"""
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol not in data.columns.get_level_values(0):
+            return pd.DataFrame()
+        data = data[symbol]
+    # Only OHLC prices are analysed; leaving Volume behind shrinks every cached frame
+    data = data[data.columns.intersection(PRICE_COLUMNS)]
+    # yf.download aligns all tickers on one shared index, so drop the padding rows
+    return data.dropna(how="all")
+
+
+def load_yfinance():
+    """Import yfinance on first use, keeping it off the window's startup path"""
+    global yf, curl_requests, YFRateLimitError, YFTickerMissingError
+    with _yfinance_lock:
+        if yf is None:
+            import yfinance
+            try:
+                from yfinance.exceptions import YFRateLimitError as rate_limit_error
+            except ImportError:  # Older yfinance releases have no dedicated rate-limit error
+                rate_limit_error = None
+            try:
+                from yfinance.exceptions import YFTickerMissingError as missing_error
+                # Make Ticker.history raise on network failures instead of returning an
+                # empty frame, so "no bars" can be told apart from "request failed"
+                yfinance.config.debug.hide_exceptions = False
+            except (ImportError, AttributeError):
+                missing_error = None
+            YFTickerMissingError = missing_error
+            try:
+                from curl_cffi import requests as curl_module
+            except ImportError:  # Without curl_cffi, yfinance manages its own session
+                curl_module = None
+            YFRateLimitError = rate_limit_error
+            curl_requests = curl_module
+            yf = yfinance
+        return yf
+
+
+def get_http_session():
+    """Return the HTTP session shared by every download, creating it once"""
+    global _http_session
+    if curl_requests is None:
+        return None
+    with _http_session_lock:
+        if _http_session is None:
+            # Browser impersonation is what yfinance itself needs to avoid being blocked
+            session = curl_requests.Session(impersonate="chrome")
+            send = session.request
+
+            def throttled_request(*args, **kwargs):
+                wait_for_request_slot()
+                return send(*args, **kwargs)
+
+            # get()/post() all go through request(), including the ones made by
+            # yf.download's internal threads, so this paces every Yahoo call
+            session.request = throttled_request
+            _http_session = session
+        return _http_session
+
+
+def wait_for_request_slot():
+    """Block until another Yahoo request fits under FETCH_RATE"""
+    global _next_request_at
+    with _request_rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_request_at)
+        _next_request_at = slot + 1.0 / FETCH_RATE
+    # Sleep outside the lock; each caller has already reserved its own slot
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _is_rate_limited(error):
+    """Return True if a yfinance error means Yahoo is throttling us"""
+    if YFRateLimitError is not None and isinstance(error, YFRateLimitError):
+        return True
+    text = str(error)
+    return "429" in text or "Too Many Requests" in text
+
+
+def call_with_backoff(fn, *args, **kwargs):
+    """Run a Yahoo request, retrying with exponential backoff while rate limited"""
+    for attempt in range(FETCH_RETRIES):
+        try:
+            with _fetch_slots:
+                return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == FETCH_RETRIES - 1 or not _is_rate_limited(e):
+                raise
+        # Sleep without holding a slot; jitter keeps retries from lining up
+        time.sleep(FETCH_BACKOFF * 2 ** attempt + random.random())
+
+
+def _download_batch(batch, start, end, interval):
+    """Download one batch of symbols and split it into per-symbol frames"""
+    # yf.download never raises for a throttled ticker (it just leaves it out), so
+    # there is nothing to back off on here; fetch_history_batch retries the missing
+    # symbols through _download_symbol, where rate-limit errors do surface.
+    # auto_adjust=True matches the Ticker.history() default used previously
+    with _fetch_slots:
+        data = yf.download(batch, start=start, end=end, interval=interval,
+                           group_by="ticker", auto_adjust=True, threads=True, progress=False,
+                           session=get_http_session())
+    frames = {}
+    for sym in batch:
+        df = split_ticker_frame(data, sym)
+        if not df.empty:
+            frames[sym] = df
+    return frames
+
+
+def _download_symbol(symbol, start, end, interval):
+    """Download a single symbol with Ticker.history (fallback for failed batches)"""
+    ticker = yf.Ticker(symbol, session=get_http_session())
+    try:
+        df = call_with_backoff(ticker.history, start=start, end=end, interval=interval)
+    except Exception as e:
+        if YFTickerMissingError is not None and isinstance(e, YFTickerMissingError):
+            return pd.DataFrame(columns=PRICE_COLUMNS)  # Yahoo answered, but has no bars for the range
+        raise
+    return df[df.columns.intersection(PRICE_COLUMNS)].dropna(how="all")
+
+
+def is_intraday(interval):
+    """Return True for minute/hour bar intervals such as "5m" or "1h" """
+    return interval.endswith(("m", "h"))
+
+
+def first_open_day(df):
+    """Return the first date whose session may still change, in the bars' exchange time.
+
+    Bars are stamped in the exchange's timezone, so "today" has to be taken
+    there too; the machine's local date can be a day ahead of (or behind) a
+    session that is still trading.
+    """
+    now = pd.Timestamp.now(tz=df.index.tz)
+    close = now.normalize() + pd.Timedelta(hours=MARKET_CLOSE.hour, minutes=MARKET_CLOSE.minute)
+    today = now.date()
+    return today + timedelta(days=1) if now >= close + SESSION_SETTLE else today
+
+
+def _forget_cached_range(key):
+    """Drop a removed cache key from the range index (lock held)"""
+    symbol, start, end, interval = key
+    ranges = _history_ranges.get((symbol, interval))
+    if ranges is not None:
+        ranges.discard((start, end))
+        if not ranges:
+            del _history_ranges[(symbol, interval)]
+
+
+def _fresh_cached_frame(key):
+    """Return the cached frame for key, or None if missing or stale (lock held)"""
+    entry = _history_cache.get(key)
+    if entry is None:
+        return None
+    fetched_at, df = entry
+    # Bars for closed sessions never change; anything reaching an open one goes stale
+    if key[2] > first_open_day(df) and time.time() - fetched_at > HISTORY_CACHE_TTL:
+        del _history_cache[key]
+        _forget_cached_range(key)
+        return None
+    _history_cache.move_to_end(key)
+    return df
+
+
+def slice_dates(df, start, end):
+    """Return the bars of df dated on or after start and before end"""
+    lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+    if df.index.tz is not None:
+        lo, hi = lo.tz_localize(df.index.tz), hi.tz_localize(df.index.tz)
+    return df.iloc[df.index.searchsorted(lo):df.index.searchsorted(hi)]
+
+
+def _get_cached_history(symbol, start, end, interval):
+    """Return cached bars for a download, or None if missing or stale"""
+    with _history_cache_lock:
+        df = _fresh_cached_frame((symbol, start, end, interval))
+        if df is not None:
+            return df
+        # Another tab may already hold a wider range of the same bars; slice it.
+        # Daily and longer bars are labelled with their period's start, so a
+        # narrower date range can't be cut out of them
+        if not is_intraday(interval):
+            return None
+        for cached_start, cached_end in list(_history_ranges.get((symbol, interval), ())):
+            if cached_start <= start and end <= cached_end:
+                wider = _fresh_cached_frame((symbol, cached_start, cached_end, interval))
+                if wider is not None:
+                    return slice_dates(wider, start, end)
+        return None
+
+
+def _put_cached_history(symbol, start, end, interval, df):
+    """Store downloaded bars, evicting the least recently used entries"""
+    key = (symbol, start, end, interval)
+    with _history_cache_lock:
+        _history_cache[key] = (time.time(), df)
+        _history_cache.move_to_end(key)
+        _history_ranges.setdefault((symbol, interval), set()).add((start, end))
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            evicted, _ = _history_cache.popitem(last=False)
+            _forget_cached_range(evicted)
+
+
+def _disk_cache_path(symbol, day, interval):
+    """Return the on-disk cache file for one symbol's bars on one day"""
+    safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+    return os.path.join(HISTORY_DISK_CACHE_DIR, interval, safe_symbol, f"{day:%Y%m%d}.pkl")
+
+
+def _load_disk_history(symbol, start, end, interval):
+    """Read a symbol's cached days in order until one is missing.
+
+    Returns (bars found on disk or None, first day that still has to be
+    downloaded); the day is None when the whole range was on disk. Only the
+    days from there on need fetching.
+    """
+    found = []
+    day = start
+    while day < end:
+        if is_trading_day(day):
+            path = _disk_cache_path(symbol, day, interval)
+            if not os.path.exists(path):
+                break
+            try:
+                bars = pd.read_pickle(path)
+            except Exception as e:
+                print(f"Error reading cached bars for {symbol}: {str(e)}")
+                break
+            if not bars.empty:  # Empty files mark days with no bars (e.g. holidays)
+                found.append(bars)
+        day += timedelta(days=1)
+    else:
+        day = None
+    return (pd.concat(found) if found else None), day
+
+
+def _store_history(symbol, start, end, interval, df, fetched_from):
+    """Cache bars in memory, and write each newly fetched closed day to disk"""
+    _put_cached_history(symbol, start, end, interval, df)
+    if not is_intraday(interval):
+        return  # Only intraday bars split cleanly into per-day files
+    # A session that may still be trading is never persisted
+    last = min(end, first_open_day(df))
+    day = fetched_from
+    try:
+        os.makedirs(os.path.dirname(_disk_cache_path(symbol, day, interval)), exist_ok=True)
+        while day < last:
+            if is_trading_day(day):
+                path = _disk_cache_path(symbol, day, interval)
+                tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+                slice_dates(df, day, day + timedelta(days=1)).to_pickle(tmp_path)
+                os.replace(tmp_path, path)  # Atomic, so concurrent writers never leave a torn file
+            day += timedelta(days=1)
+    except Exception as e:
+        print(f"Error caching bars for {symbol}: {str(e)}")
+
+
+def fetch_history_batch(symbols, start, end, interval, on_progress=None):
+    """Download bars for many symbols using batched yf.download calls.
+
+    Batches run concurrently so one slow batch doesn't hold up the rest.
+    Symbols already downloaded with the same range and interval are served
+    from memory. Closed days are also kept on disk per symbol, so only the
+    days after the last cached one are downloaded. Returns a dict of
+    symbol -> DataFrame; symbols without data are left out. The returned
+    frames are shared with the cache, so treat them as read-only.
+    """
+    frames = {}
+    cached_head = {}  # symbol -> bars read from disk before its first missing day
+    fetch_from = {}  # symbol -> first day it still needs downloaded
+    pending = {}  # first missing day -> symbols, so each batch shares one range
+    done = 0
+    for sym in symbols:
+        df = _get_cached_history(sym, start, end, interval)
+        if df is None:
+            if is_intraday(interval):
+                df, first_missing = _load_disk_history(sym, start, end, interval)
+            else:
+                df, first_missing = None, start  # Not cached on disk; download the whole range
+            if first_missing is not None:
+                cached_head[sym] = df
+                fetch_from[sym] = first_missing
+                pending.setdefault(first_missing, []).append(sym)
+                continue
+            if df is not None:
+                _put_cached_history(sym, start, end, interval, df)
+        done += 1
+        if df is not None and not df.empty:
+            frames[sym] = df
+
+    def merge(sym, fetched):
+        """Join disk-cached days with freshly fetched ones and cache the result"""
+        head = cached_head.get(sym)
+        df = fetched if head is None else pd.concat([head, fetched])
+        _store_history(sym, start, end, interval, df, fetch_from[sym])
+        frames[sym] = df
+
+    def settle(sym):
+        """Cache a symbol whose download had no new bars, so the same days aren't asked for again"""
+        head = cached_head.get(sym)
+        if head is None:
+            head = pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], tz=EXCHANGE_TZ))
+        else:
+            frames[sym] = head
+        # Writes empty markers for the closed days that were fetched, and a memory
+        # entry that follows the usual TTL rule for sessions still open
+        _store_history(sym, start, end, interval, head, fetch_from[sym])
+
+    total = len(symbols)
+    if on_progress and done:
+        on_progress(done, total)
+    if pending:
+        load_yfinance()
+    batches = [(day, syms[i:i + FETCH_BATCH_SIZE])
+               for day, syms in pending.items()
+               for i in range(0, len(syms), FETCH_BATCH_SIZE)]
+    failed = []
+    empty_batches = []
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = {executor.submit(_download_batch, batch, day, end, interval): batch
+                   for day, batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                fetched = future.result()
+            except Exception as e:
+                print(f"Error downloading {', '.join(batch)}: {str(e)}")
+                failed.extend(batch)
+                continue
+            if not fetched:
+                # Nothing came back for any symbol: usually a range with no session
+                # yet (a holiday, or today before the open) rather than throttling
+                empty_batches.append(batch)
+                continue
+            for sym, df in fetched.items():
+                merge(sym, df)
+            # yf.download swallows per-ticker errors (throttling, timeouts,
+            # delistings) and just leaves those symbols out, so retry them too
+            missing = [sym for sym in batch if sym not in fetched]
+            failed.extend(missing)
+            done += len(batch) - len(missing)
+            if on_progress:
+                on_progress(done, total)
+
+        # Confirm an empty batch with one symbol before retrying the rest one by one
+        futures = {executor.submit(_download_symbol, batch[0], fetch_from[batch[0]], end, interval): batch
+                   for batch in empty_batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"Error downloading {', '.join(batch)}: {str(e)}")
+                done += len(batch)
+            else:
+                if df.empty:
+                    for sym in batch:
+                        settle(sym)
+                    done += len(batch)
+                else:
+                    merge(batch[0], df)
+                    failed.extend(batch[1:])
+                    done += 1
+            if on_progress:
+                on_progress(done, total)
+
+        # Retry failed batches and missing symbols one at a time so a single bad
+        # ticker (or a flaky multi-symbol request) doesn't lose the whole batch
+        futures = {executor.submit(_download_symbol, sym, fetch_from[sym], end, interval): sym
+                   for sym in failed}
+        for future in as_completed(futures):
+            sym = futures[future]
+            try:
+                df = future.result()
+                if df.empty:
+                    if cached_head.get(sym) is None:  # Cached days still count as data
+                        print(f"No data for {sym}")
+                    settle(sym)
+                else:
+                    merge(sym, df)
+            except Exception as e:
+                print(f"Error downloading {sym}: {str(e)}")
+            done += 1
+            if on_progress:
+                on_progress(done, total)
+    for sym, head in cached_head.items():
+        if sym not in frames and head is not None:
+            frames[sym] = head  # The download failed; serve the cached days
+    return frames
+
+
+def day_bounds(index):
+    """Return (days, starts, ends) of the per-day row runs in a sorted DatetimeIndex.
+
+    Bars arrive time-sorted, so each day is one contiguous run of rows; callers
+    slice price arrays with [start:end] instead of grouping bars into buckets.
+    """
+    days = index.normalize()
+    if days.empty:
+        return days, np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    keys = days.asi8
+    bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.r_[0, bounds]
+    return days[starts], starts, np.r_[bounds, len(keys)]
+
+
+def price_array(series):
+    """Return a price column as a C-contiguous float64 array.
+
+    The swing/cycle kernels expect this layout so NumPy and numba can stream
+    through the buffer without strided access or pandas overhead.
+    """
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64, copy=False))
+
+
+def _count_swings_loop(prices, threshold):
+    """Scalar swing counter, compiled with numba when it is installed"""
+    up = 0
+    down = 0
+    ref = prices[0]
+    for i in range(1, prices.shape[0]):
+        p = prices[i]
+        pct_change = (p - ref) / ref * 100
+        if pct_change >= threshold:
+            up += 1
+            ref = p
+        elif pct_change <= -threshold:
+            down += 1
+            ref = p
+    return up, down
+
+
+def _count_cycles_loop(prices, ref, threshold):
+    """Scalar reversal-cycle counter, compiled with numba when it is installed"""
+    cycles = 0
+    direction = 0  # 1 after an up move, -1 after a down move, 0 when waiting
+    for i in range(prices.shape[0]):
+        p = prices[i]
+        pct_change = (p - ref) / ref * 100
+        if direction == 0:
+            if pct_change >= threshold:
+                direction = 1
+                ref = p
+            elif pct_change <= -threshold:
+                direction = -1
+                ref = p
+        elif (direction == 1 and pct_change <= -threshold) or (direction == -1 and pct_change >= threshold):
+            cycles += 1
+            direction = 0
+            ref = p
+    return cycles
+
+
+if njit is not None:
+    # error_model="numpy" makes a zero price divide to inf/nan, as in the NumPy
+    # fallback, instead of raising ZeroDivisionError and dropping the symbol
+    _count_swings_loop = njit(cache=True, error_model="numpy")(_count_swings_loop)
+    _count_cycles_loop = njit(cache=True, error_model="numpy")(_count_cycles_loop)
+
+
+def warm_up_kernels():
+    """Compile the numba kernels ahead of the first analysis run"""
+    if njit is None:
+        return
+    writable = np.array([1.0, 1.0])
+    # price_array() hands out read-only views of pandas data, which numba
+    # compiles as a separate signature, so warm up both layouts
+    readonly = writable.copy()
+    readonly.setflags(write=False)
+    for prices in (writable, readonly):
+        count_swings(prices, 1.0)
+        count_cycles(prices, 1.0, 1.0)
+
+
+def count_swings(prices, threshold):
+    """Count up/down moves of at least `threshold` % from a resetting reference price.
+
+    The reference resets to the price at every swing, so the scan jumps from one
+    swing to the next with a vectorized search instead of stepping bar by bar.
+    """
+    if njit is not None:
+        return _count_swings_loop(prices, float(threshold))
+
+    up = down = 0
+    i = 0
+    n = len(prices)
+    while i < n - 1:
+        ref = prices[i]
+        # Search a doubling window ahead of the reference rather than the whole tail,
+        # so frequent swings don't rescan the rest of the day each time
+        start = i + 1
+        width = SWING_SCAN_WINDOW
+        while start < n:
+            pct_change = (prices[start:start + width] - ref) / ref * 100
+            hits = np.flatnonzero((pct_change >= threshold) | (pct_change <= -threshold))
+            if hits.size:
+                break
+            start += width
+            width *= 2
+        else:
+            break
+        hit = hits[0]
+        if pct_change[hit] >= threshold:
+            up += 1
+        else:
+            down += 1
+        i = start + hit
+    return up, down
+
+
+def count_cycles(prices, open_price, threshold):
+    """Count reversal cycles: a `threshold` % move one way followed by one back.
+
+    The reference starts at the day's open and resets at every move. Like
+    count_swings, the NumPy path jumps between moves with a windowed search.
+    """
+    if njit is not None:
+        return _count_cycles_loop(prices, float(open_price), float(threshold))
+
+    cycles = 0
+    direction = 0
+    ref = open_price
+    start = 0
+    n = len(prices)
+    while start < n:
+        width = SWING_SCAN_WINDOW
+        while start < n:
+            pct_change = (prices[start:start + width] - ref) / ref * 100
+            # While a move is open only the opposite move matters
+            if direction == 1:
+                mask = pct_change <= -threshold
+            elif direction == -1:
+                mask = pct_change >= threshold
+            else:
+                mask = (pct_change >= threshold) | (pct_change <= -threshold)
+            hits = np.flatnonzero(mask)
+            if hits.size:
+                break
+            start += width
+            width *= 2
+        else:
+            break
+        hit = hits[0]
+        if direction:
+            cycles += 1
+            direction = 0
+        else:
+            direction = 1 if pct_change[hit] >= threshold else -1
+        ref = prices[start + hit]
+        start += hit + 1
+    return cycles
+
+
+def early_session_records(df, start_time):
+    """Build one symbol's per-day anchor records for the Early Session tab.
+
+    Every day is reduced at once with groupby aggregations over the regular
+    session, instead of slicing and scanning each day in Python.
+    """
+    # Filter for regular market hours (09:30 - 16:00)
+    session = df.between_time(MARKET_OPEN, MARKET_CLOSE)
+    days = session.index.normalize()
+    time_of_day = session.index - days
+    hour, minute = start_time.split(":")
+    anchor_offset = pd.Timedelta(hours=int(hour), minutes=int(minute))
+
+    # Anchor price at the user-defined start time; days without that bar
+    # (e.g. data gaps) are skipped
+    is_anchor = time_of_day == anchor_offset
+    anchors = session["Close"][is_anchor]
+    anchors.index = days[is_anchor]
+    price_at_start = anchors[~anchors.index.duplicated()]
+
+    # Post-start-time session (including the start time bar)
+    post = session[(time_of_day >= anchor_offset) & days.isin(price_at_start.index)]
+    post_days = post.index.normalize()
+    highs = post["High"].dropna()
+    lows = post["Low"].dropna()
+    stats = pd.DataFrame({
+        "price_at_start": price_at_start,
+        "post_high": post["High"].groupby(post_days).max(),
+        "post_low": post["Low"].groupby(post_days).min(),
+        # Timestamps of the first bar reaching the post-start-time high / low
+        "high_at": highs.groupby(highs.index.normalize()).idxmax(),
+        "low_at": lows.groupby(lows.index.normalize()).idxmin(),
+    }).dropna(subset=["high_at", "low_at"])
+    if stats.empty:
+        return []
+
+    start_prices = stats["price_at_start"].to_numpy()
+    post_high = stats["post_high"].to_numpy()
+    post_low = stats["post_low"].to_numpy()
+    high_times = stats["high_at"].dt.strftime("%H:%M").tolist()
+    low_times = stats["low_at"].dt.strftime("%H:%M").tolist()
+    # Dynamic selection logic:
+    # If post-session high is above the start time price, treat the move as HIGH.
+    # Otherwise, treat it as LOW, using the post-session low.
+    is_high = post_high > start_prices
+    selected = np.where(is_high, post_high, post_low)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_gain = np.where(start_prices > 0, (selected - start_prices) / start_prices * 100, 0.0)
+
+    return [
+        {
+            "date": day.date(),
+            "price_at_start": start_prices[i],
+            "post_high": post_high[i],
+            "post_low": post_low[i],
+            "selected_price": selected[i],
+            "direction": "HIGH" if is_high[i] else "LOW",
+            "high_time": high_times[i],
+            "low_time": low_times[i],
+            "pct_gain": pct_gain[i],
+        }
+        for i, day in enumerate(stats.index)
+    ]
+
+
+def read_symbol_csv(path):
+    """Read upper-cased symbols from the first column of a CSV file"""
+    try:
+        # keep_default_na=False so tickers like "NA" aren't read as missing
+        column = pd.read_csv(path, header=None, usecols=[0], dtype=str, keep_default_na=False).iloc[:, 0]
+    except pd.errors.EmptyDataError:
+        return []  # clear_symbols() leaves an empty file behind
+    symbols = column.str.strip().str.upper()
+    return symbols[symbols != ""].tolist()
+
+
+def normalize_symbols(symbols):
+    """Return symbols stripped, upper-cased and deduplicated, in first-seen order"""
+    # Normalise before deduplicating so "aapl" and "AAPL " collapse to one entry;
+    # dict keys dedupe in one pass and keep the user's ordering
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
 class StockUniverse:
     """Manages stock symbols via CSV file"""
+
+    __slots__ = ("csv_path", "_symbols", "_symbols_stamp")
     
     def __init__(self, csv_path=DEFAULT_CSV):
         self.csv_path = csv_path
+        self._symbols = None  # Last parsed symbol list
+        self._symbols_stamp = None  # (mtime_ns, size) of the file it was parsed from
         if not os.path.exists(csv_path):
-            self.save_symbols(["AAPL", "MSFT", "GOOGL", "TSLA"])
+            self.save_symbols(DEFAULT_SYMBOLS)
 
     def load_symbols(self):
         try:
-            with open(self.csv_path, "r") as f:
-                return [row[0].strip().upper() for row in csv.reader(f) if row and row[0].strip()]
+            # Re-parse only when the file has changed since the last load
+            st = os.stat(self.csv_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != self._symbols_stamp:
+                self._symbols = read_symbol_csv(self.csv_path)
+                self._symbols_stamp = stamp
+            return list(self._symbols)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load symbols: {str(e)}")
             return []
 
     def save_symbols(self, symbols):
+        self._symbols_stamp = None  # Writes can land within the same mtime tick
         try:
-            with open(self.csv_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                for s in sorted(set(symbols)):
-                    if s.strip():
-                        writer.writerow([s.strip().upper()])
+            with open(self.csv_path, "w", newline="", buffering=1 << 16) as f:  # One write for typical universes
+                # One writerows call keeps the row loop inside the C csv writer
+                csv.writer(f).writerows((s,) for s in normalize_symbols(symbols))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save symbols: {str(e)}")
     
@@ -98,9 +799,8 @@ class StockUniverse:
             return self.load_symbols()
         else:
             # Create default symbols
-            default_symbols = ["AAPL", "MSFT", "GOOGL", "TSLA"]
-            self.save_symbols(default_symbols)
-            return default_symbols
+            self.save_symbols(DEFAULT_SYMBOLS)
+            return list(DEFAULT_SYMBOLS)
 
 
 class StockAnalysisApp:
@@ -116,6 +816,7 @@ class StockAnalysisApp:
         # Initialize active_symbols with loaded symbols
         self.active_symbols = self.universe.load_symbols()
         self.symbol_selection_mode = tk.StringVar(value="csv")  # "csv" or "manual"
+        self._help_win = None  # Built on first use, then hidden and reshown
  
         self.interval_var = tk.StringVar(value="1m")
         self.duration_var = tk.IntVar(value=1)
@@ -425,8 +1126,7 @@ class StockAnalysisApp:
         )
         if file_path:
             try:
-                with open(file_path, 'r') as f:
-                    symbols = [row[0].strip().upper() for row in csv.reader(f) if row and row[0].strip()]
+                symbols = normalize_symbols(read_symbol_csv(file_path))
                 self.universe.save_symbols(symbols)
                 self.active_symbols = symbols  # Update active symbols
                 messagebox.showinfo("Success", f"Loaded {len(symbols)} symbols from {os.path.basename(file_path)}")
@@ -448,8 +1148,7 @@ class StockAnalysisApp:
         def save():
             symbol = entry.get().strip().upper()
             if symbol:
-                symbols = self.universe.load_symbols()
-                symbols.append(symbol)
+                symbols = normalize_symbols(self.universe.load_symbols() + [symbol])
                 self.universe.save_symbols(symbols)
                 self.active_symbols = symbols  # Update active symbols
                 messagebox.showinfo("Success", f"Added {symbol}")
@@ -476,7 +1175,7 @@ class StockAnalysisApp:
         
         def save():
             content = text.get("1.0", tk.END)
-            new_symbols = [s.strip().upper() for s in content.split("\n") if s.strip()]
+            new_symbols = normalize_symbols(content.split("\n"))
             self.universe.save_symbols(new_symbols)
             self.active_symbols = new_symbols  # Update active symbols
             messagebox.showinfo("Success", f"Updated {len(new_symbols)} symbols")
@@ -488,7 +1187,13 @@ class StockAnalysisApp:
 
     def show_help(self):
         """Show help dialog describing each tab and the controls"""
-        help_win = tk.Toplevel(self.root)
+        if self._help_win is not None and self._help_win.winfo_exists():
+            self._help_win.deiconify()
+            self._help_win.lift()
+            return
+
+        help_win = self._help_win = tk.Toplevel(self.root)
+        help_win.protocol("WM_DELETE_WINDOW", help_win.withdraw)
         help_win.title("Help — Intraday Stock Analysis Suite")
         help_win.geometry("750x650")
         help_win.configure(bg="#f8fafc")
@@ -582,30 +1287,17 @@ Identifies "ping-pong" price action. Detects completed cycles where the price mo
         
         text.config(state=tk.DISABLED)
 
-        tk.Button(help_win, text="Close", command=help_win.destroy, bg="#3b82f6", fg="white",
+        tk.Button(help_win, text="Close", command=help_win.withdraw, bg="#3b82f6", fg="white",
                   font=("Helvetica", 10, "bold"), padx=12, pady=8).pack(pady=8)
     
     def _insert_formatted_line(self, text_widget, line, base_tag):
         """Insert a line of text with markdown formatting (bold, italic, code)"""
-        import re
-        
-        # Pattern for **bold**
-        bold_pattern = r'\*\*([^*]+)\*\*'
-        # Pattern for `code`
-        code_pattern = r'`([^`]+)`'
-        
-        # Find all matches with their positions
-        matches = []
-        for match in re.finditer(bold_pattern, line):
-            matches.append((match.start(), match.end(), 'bold', match.group(1)))
-        for match in re.finditer(code_pattern, line):
-            matches.append((match.start(), match.end(), 'code', match.group(1)))
-        
-
-        matches.sort(key=lambda x: x[0])
-        
         last_pos = 0
-        for start, end, tag_type, content in matches:
+        # One pass labels both span types, already in order of position
+        for match in MARKDOWN_SPAN_RE.finditer(line):
+            start, end = match.span()
+            tag_type = 'bold' if match.group(1) is not None else 'code'
+            content = match.group(match.lastindex)
             if start > last_pos:
                 text_widget.insert(tk.END, line[last_pos:start], base_tag)
 
@@ -641,6 +1333,7 @@ class BaseTab:
         self.universe = universe
         self.frame = tk.Frame(notebook, bg="#f8fafc")
         self.is_running = False
+        self.result_queue = queue.Queue()  # Worker thread -> main thread messages
         self.progress_var = tk.DoubleVar(value=0)
         self.progress_label = None
         self.progress_bar = None
@@ -648,6 +1341,9 @@ class BaseTab:
         self.expanded_items = set()  # Track which items are expanded
         # Map Treeview item -> original symbol text (for icon updates)
         self._item_symbol = {}
+        # Input adjustments for the current run, shown beside the progress count
+        # instead of in a modal dialog that would hold up the fetch
+        self.run_notices = []
     
     def create_help_button(self, parent, feature_name, row=None, column=None):
         """Create a small '?' help button"""
@@ -745,8 +1441,70 @@ class BaseTab:
         if total > 0:
             progress_value = (current / total) * 100
             self.progress_var.set(progress_value)
-            self.progress_label.config(text=f"Processing: {current}/{total}")
-            self.frame.update_idletasks()
+            notices = f" ({'; '.join(self.run_notices)})" if self.run_notices else ""
+            self.progress_label.config(text=f"Processing: {current}/{total}{notices}")
+
+    def start_analysis(self, worker, *args):
+        """Clear results and run worker(*args) on a background thread"""
+        self.is_running = True
+        self.tree.delete(*self.tree.get_children())
+        self.expanded_items.clear()
+        self._item_symbol.clear()  # Drop labels of the rows just deleted
+        Thread(target=self._run_worker, args=(worker, args), daemon=True).start()
+        self.frame.after(QUEUE_POLL_MS, self._drain_results)
+
+    def _run_worker(self, worker, args):
+        """Thread body: run the analysis and always signal completion"""
+        error = None
+        try:
+            worker(*args)
+        except Exception as e:
+            print(f"Error running analysis: {str(e)}")
+            error = e
+        finally:
+            # Carry the failure to the Tk thread so it isn't reported as success
+            self.result_queue.put(("done", error))
+
+    def post_progress(self, current, total):
+        """Queue a progress update from the worker thread"""
+        self.result_queue.put(("progress", current, total))
+
+    def post_result(self, *payload):
+        """Queue one symbol's results from the worker thread"""
+        self.result_queue.put(("result",) + payload)
+
+    def render_result(self, *payload):
+        """Add one symbol's rows to the tree (main thread)"""
+        raise NotImplementedError
+
+    def _drain_results(self):
+        """Render queued worker output in batches; Tk is only touched here"""
+        progress = None
+        delay = 1  # Come straight back if the batch limit left messages queued
+        for _ in range(QUEUE_DRAIN_BATCH):
+            try:
+                msg = self.result_queue.get_nowait()
+            except queue.Empty:
+                delay = QUEUE_POLL_MS
+                break
+            if msg[0] == "progress":
+                progress = msg[1:]  # Only the latest progress matters
+            elif msg[0] == "result":
+                self.render_result(*msg[1:])
+            else:
+                self.is_running = False
+                error = msg[1]
+                if error is not None:
+                    self.reset_progress()
+                    messagebox.showerror("Error", f"Analysis failed: {str(error)}")
+                    return
+                # The "✓ Complete" label replaces the final count, so only fill the bar
+                self.progress_var.set(100)
+                self.reset_progress(success=True)
+                return
+        if progress:
+            self.update_progress(*progress)
+        self.frame.after(delay, self._drain_results)
 
     def reset_progress(self, success=False):
         """Reset progress bar, optionally show success state"""
@@ -847,6 +1605,10 @@ class BaseTab:
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
         tree.configure(yscrollcommand=scrollbar.set)
         
+        # Threshold colours are configured once here rather than on every inserted row
+        for color in THRESHOLD_COLORS.values():
+            tree.tag_configure(color, background=color)
+        
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -889,75 +1651,64 @@ class BaseTab:
     def _on_item_expand(self, event):
         """Handle item expansion event"""
         tree = event.widget
-        # Find which item was expanded by checking all items
-        for item in tree.get_children():
-            if tree.get_children(item) and tree.item(item, "open"):
-                self.expanded_items.add(item)
-                self.update_expand_icon(tree, item, True)
+        # Tk only opens the focus item, so there's no need to scan every row
+        item = tree.focus()
+        if item and tree.get_children(item):
+            self.expanded_items.add(item)
+            self.update_expand_icon(tree, item, True)
     
     def _on_item_collapse(self, event):
         """Handle item collapse event"""
         tree = event.widget
-        # Find which item was collapsed by checking all items
-        for item in tree.get_children():
-            if tree.get_children(item) and not tree.item(item, "open"):
-                self.expanded_items.discard(item)
-                self.update_expand_icon(tree, item, False)
+        item = tree.focus()
+        if item and tree.get_children(item):
+            self.expanded_items.discard(item)
+            self.update_expand_icon(tree, item, False)
     
     def toggle_view_mode(self):
         """Toggle between detailed and average view modes"""
         # This will be overridden by specific tabs if needed
         pass
 
-    def add_colored_row(self, tree, values, threshold_col=None, threshold_val=0, reverse=False):
-        """Add row with color coding"""
-        item = tree.insert("", tk.END, values=values)
-        
-        if threshold_col is not None and len(values) > threshold_col:
+    def _threshold_tags(self, values, threshold_col, threshold_val, reverse, raw_val=None):
+        """Return the colour tag for a row based on its threshold column"""
+        if raw_val is None:
+            # Fall back to parsing the formatted cell when the caller has no number
+            if threshold_col is None or len(values) <= threshold_col:
+                return ()
             try:
-                val = float(str(values[threshold_col]).rstrip('%'))
-                if reverse:
-                    color = '#fee2e2' if val > threshold_val else '#dcfce7' if val < -threshold_val else '#fef3c7'
-                else:
-                    color = '#dcfce7' if val > threshold_val else '#fee2e2' if val < -threshold_val else '#fef3c7'
-                tree.item(item, tags=(color,))
-                tree.tag_configure(color, background=color)
+                raw_val = float(str(values[threshold_col]).rstrip('%'))
             except ValueError:
-                pass
-        
-        return item
+                return ()
+        side = 1 if raw_val > threshold_val else -1 if raw_val < -threshold_val else 0
+        return (THRESHOLD_COLORS[-side if reverse else side],)
 
-    def add_parent_row(self, tree, values, threshold_col=None, threshold_val=0, reverse=False):
+    def add_colored_row(self, tree, values, threshold_col=None, threshold_val=0, reverse=False, raw_val=None):
+        """Add row with color coding"""
+        tags = self._threshold_tags(values, threshold_col, threshold_val, reverse, raw_val)
+        return tree.insert("", tk.END, values=values, tags=tags)
+
+    def add_parent_row(self, tree, values, threshold_col=None, threshold_val=0, reverse=False, tags=(),
+                       raw_val=None):
         """Add a parent row for collapsible tree with +/- icon"""
         if not values:
             return tree.insert("", tk.END, text="+", values=(), open=False)
 
         symbol = str(values[0])
-        item = tree.insert("", tk.END, text=f"+ {symbol}", values=values[1:], open=False)
+        # Tags go in with the insert so each row costs a single Tk call
+        tags = tags or self._threshold_tags(values, threshold_col, threshold_val, reverse, raw_val)
+        item = tree.insert("", tk.END, text=f"+ {symbol}", values=values[1:], open=False, tags=tags)
         self._item_symbol[item] = symbol
-        
-        if threshold_col is not None and len(values) > threshold_col:
-            try:
-                val = float(str(values[threshold_col]).rstrip('%'))
-                if reverse:
-                    color = '#fee2e2' if val > threshold_val else '#dcfce7' if val < -threshold_val else '#fef3c7'
-                else:
-                    color = '#dcfce7' if val > threshold_val else '#fee2e2' if val < -threshold_val else '#fef3c7'
-                tree.item(item, tags=(color,))
-                tree.tag_configure(color, background=color)
-            except ValueError:
-                pass
-        
         return item
 
-    def add_child_row(self, tree, parent, values):
+    def add_child_row(self, tree, parent, values, tags=()):
         """Add a child row to a parent"""
         # For children, the first element of `values` is displayed under the Symbol column (#0),
         # and the remaining values fill the data columns.
         if not values:
-            item = tree.insert(parent, tk.END, text="", values=())
+            item = tree.insert(parent, tk.END, text="", values=(), tags=tags)
         else:
-            item = tree.insert(parent, tk.END, text=str(values[0]), values=values[1:])
+            item = tree.insert(parent, tk.END, text=str(values[0]), values=values[1:], tags=tags)
         return item
 
 
@@ -991,74 +1742,69 @@ class SwingCounterTab(BaseTab):
         self.tree = self.create_treeview(("Symbol", "Up Swings", "Down Swings", "Total Swings", "Avg Daily"))
 
     def run(self):
-        self.tree.delete(*self.tree.get_children())
-        self.expanded_items.clear()
+        if self.is_running:
+            return
         # Use active_symbols if available, otherwise load from CSV
         symbols = self.app.active_symbols if self.app.active_symbols else self.universe.load_symbols()
-        total_symbols = len(symbols)
         
         if not symbols:
             messagebox.showwarning("No Symbols", "Please load or select symbols first")
             return
         
+        # Read Tk variables here; the worker thread must not touch them
         start_date, end_date = self.get_date_range()
+        interval = self.app.interval_var.get().strip()
+        threshold = self.swing_pct.get()
+        self.start_analysis(self._analyze, symbols, start_date, end_date, interval, threshold)
+
+    def _analyze(self, symbols, start_date, end_date, interval, threshold):
+        """Worker thread: count daily swings and post them per symbol"""
+        total_symbols = len(symbols)
+        frames = fetch_history_batch(symbols, start_date, end_date + timedelta(days=1), interval,
+                                     on_progress=self.post_progress)
         
-        for idx, sym in enumerate(symbols):
-            self.update_progress(idx, total_symbols)
+        for sym in symbols:
             try:
-                interval = self.app.interval_var.get().strip()
-                # Use date range instead of period
-                data = yf.Ticker(sym).history(start=start_date, end=end_date + timedelta(days=1), interval=interval)
-
-                if data.empty:
+                data = frames.get(sym)
+                if data is None:
                     continue
 
-                # Group by date to track daily swings
-                data["date"] = data.index.date
+                # Track daily swings on views of one contiguous close array (frames
+                # are shared with the history cache, so they're never modified)
                 daily_swings = []
                 
-                for date, day_data in data.groupby("date"):
-                    prices = day_data["Close"].values
-                    if len(prices) < 2:
+                closes = price_array(data["Close"])
+                for day, start, end in zip(*day_bounds(data.index)):
+                    if end - start < 2:
                         continue
                     
-                    up = down = 0
-                    ref = prices[0]
-                    
-                    for p in prices[1:]:
-                        pct_change = (p - ref) / ref * 100
-                        if pct_change >= self.swing_pct.get():
-                            up += 1
-                            ref = p
-                        elif pct_change <= -self.swing_pct.get():
-                            down += 1
-                            ref = p
-                    
-                    daily_swings.append((date, up, down, up + down))
+                    up, down = count_swings(closes[start:end], threshold)
+                    daily_swings.append((day.date(), up, down, up + down))
                 
                 if not daily_swings:
                     continue
                 
-                # Calculate summary
-                total_up = sum(x[1] for x in daily_swings)
-                total_down = sum(x[2] for x in daily_swings)
-                total_all = sum(x[3] for x in daily_swings)
-                avg_daily = total_all / len(daily_swings) if daily_swings else 0
-                
-                # Add parent row with summary
-                parent = self.add_parent_row(self.tree, 
-                                            (sym, total_up, total_down, total_all, f"{avg_daily:.2f}"),
-                                            3, 5)
-                
-                # Add child rows with daily data
-                for date, up, down, total in daily_swings:
-                    self.add_child_row(self.tree, parent, (f"  {date}", up, down, total, ""))
+                # Up/down/total sums in one reduction, done here rather than on the Tk thread
+                totals = np.array([day[1:] for day in daily_swings]).sum(axis=0)
+                self.post_result(sym, daily_swings, *totals.tolist())
                 
             except Exception as e:
                 print(f"Error processing {sym}: {str(e)}")
         
-        self.update_progress(total_symbols, total_symbols)
-        self.reset_progress(success=True)
+        self.post_progress(total_symbols, total_symbols)
+
+    def render_result(self, sym, daily_swings, total_up, total_down, total_all):
+        """Add summary and per-day swing rows for one symbol"""
+        avg_daily = total_all / len(daily_swings)
+        
+        # Add parent row with summary
+        parent = self.add_parent_row(self.tree, 
+                                    (sym, total_up, total_down, total_all, f"{avg_daily:.2f}"),
+                                    3, 5, raw_val=total_all)
+        
+        # Add child rows with daily data
+        for date, up, down, total in daily_swings:
+            self.add_child_row(self.tree, parent, (f"  {date}", up, down, total, ""))
 
 
 class DownFromHighTab(BaseTab):
@@ -1088,11 +1834,10 @@ class DownFromHighTab(BaseTab):
         self.tree = self.create_treeview(("Symbol", "Current Price", "Day High", "% Down"))
 
     def run(self):
-        self.tree.delete(*self.tree.get_children())
-        self.expanded_items.clear()
+        if self.is_running:
+            return
         symbols = self.app.active_symbols if self.app.active_symbols else self.universe.load_symbols()
         threshold = self.n_pct.get()
-        total_symbols = len(symbols)
         
         if not symbols:
             messagebox.showwarning("No Symbols", "Please load or select symbols first")
@@ -1103,7 +1848,7 @@ class DownFromHighTab(BaseTab):
         current_time = datetime.now().time()
         is_market_open = (
             is_trading_day(today) and
-            datetime.strptime("09:30", "%H:%M").time() <= current_time <= datetime.strptime("16:00", "%H:%M").time()
+            MARKET_OPEN <= current_time <= MARKET_CLOSE
         )
         
         if is_market_open:
@@ -1115,43 +1860,54 @@ class DownFromHighTab(BaseTab):
             analysis_date = get_previous_trading_day(today)
             check_type = "low"  # Check previous day's low vs high
         
-        for idx, sym in enumerate(symbols):
-            self.update_progress(idx, total_symbols)
+        interval = self.app.interval_var.get().strip()
+        self.start_analysis(self._analyze, symbols, analysis_date, check_type, interval, threshold)
+
+    def _analyze(self, symbols, analysis_date, check_type, interval, threshold):
+        """Worker thread: post symbols that are down at least threshold% from the high"""
+        total_symbols = len(symbols)
+        # Fetch data for the analysis date only
+        frames = fetch_history_batch(symbols, analysis_date, analysis_date + timedelta(days=1), interval,
+                                     on_progress=self.post_progress)
+        
+        # Gather each symbol's day high and comparison price, skipping any symbol
+        # whose frame is malformed, then score them all at once
+        scored, highs, currents = [], [], []
+        for sym in symbols:
+            df = frames.get(sym)
+            if df is None:
+                continue
             try:
-                interval = self.app.interval_var.get().strip()
-                # Fetch data for the analysis date only
-                df = yf.Ticker(sym).history(start=analysis_date, end=analysis_date + timedelta(days=1), interval=interval)
-                
-                if df.empty:
-                    continue
-                
-                # Get high price for the day
-                high = df["High"].max()
-                
+                high = np.nanmax(price_array(df["High"]))
                 if check_type == "current":
                     # During market hours: use current (latest) close price
-                    current = df["Close"].iloc[-1]
+                    current = price_array(df["Close"])[-1]
                 else:
                     # After hours: use the LOW price of the day
-                    current = df["Low"].min()
-                
-                # Calculate how much down from high
-                drop = (high - current) / high * 100
-                
-                # Only show if it meets the threshold
-                if drop < threshold:
-                    continue
-                
-                # Add single row
-                self.add_parent_row(self.tree, 
-                                (sym, f"${current:.2f}", f"${high:.2f}", f"{drop:.2f}%"),
-                                3, threshold, reverse=True)
-                
+                    current = np.nanmin(price_array(df["Low"]))
             except Exception as e:
                 print(f"Error processing {sym}: {str(e)}")
+                continue
+            scored.append(sym)
+            highs.append(high)
+            currents.append(current)
+
+        highs = np.array(highs, dtype=np.float64)
+        currents = np.array(currents, dtype=np.float64)
+        # Calculate how much down from high
+        drops = (highs - currents) / highs * 100
+        
+        # Only show symbols that meet the threshold
+        for i in np.flatnonzero(~(drops < threshold)):
+            self.post_result(scored[i], currents[i], highs[i], drops[i], threshold)
         
-        self.update_progress(total_symbols, total_symbols)
-        self.reset_progress(success=True)
+        self.post_progress(total_symbols, total_symbols)
+
+    def render_result(self, sym, current, high, drop, threshold):
+        """Add the single row for a symbol that met the threshold"""
+        self.add_parent_row(self.tree, 
+                        (sym, f"${current:.2f}", f"${high:.2f}", f"{drop:.2f}%"),
+                        3, threshold, reverse=True, raw_val=round(drop, 2))  # Colour by the value shown
 
     # def run(self):
     #     self.tree.delete(*self.tree.get_children())
@@ -1221,6 +1977,8 @@ class DownFromHighTab(BaseTab):
 class EarlySessionTab(BaseTab):
     """Tab 3: Early Session Performance Analyzer with Opening Cross Analysis"""
     
+    PRICE_COLUMN = "Price at start"  # Column id; the heading shows the actual time
+
     def __init__(self, notebook, universe, app):
         super().__init__(notebook, universe, app)
         self.stored_data = {}  # Store data for view mode switching
@@ -1263,12 +2021,11 @@ class EarlySessionTab(BaseTab):
         self.create_progress_bar()
         
         # Unified column model so we can show different subsets per view mode.
-        # Column headers will be updated dynamically based on start time
-        start_time = self.start_time_var.get()
+        # The price column keeps a fixed id; only its heading follows the start time
         self.columns = (
             "Symbol",
             "Date",
-            f"Price at {start_time}",  # Dynamic column name
+            self.PRICE_COLUMN,
             "Indication",
             "Highest value",
             "Lowest value",
@@ -1277,6 +2034,7 @@ class EarlySessionTab(BaseTab):
             "Remarks",
         )
         self.tree = self.create_treeview(self.columns)
+        self._update_column_headers()
 
         # Direction-based styling (green for HIGH, red for LOW)
         self.tree.tag_configure(
@@ -1298,26 +2056,7 @@ class EarlySessionTab(BaseTab):
     def _update_column_headers(self):
         """Update column headers to reflect current start time"""
         start_time = self.start_time_var.get()
-        # Rebuild columns with new start time
-        self.columns = (
-            "Symbol",
-            "Date",
-            f"Price at {start_time}",
-            "Indication",
-            "Highest value",
-            "Lowest value",
-            "Direction",
-            "% Gain",
-            "Remarks",
-        )
-        # Update the column header if tree exists
-        if hasattr(self, 'tree') and self.tree:
-            try:
-                # Find the price column (should be index 2 in data columns)
-                price_col = self.columns[2]
-                self.tree.heading(price_col, text=price_col)
-            except Exception as e:
-                print(f"Warning: Could not update column header: {e}")
+        self.tree.heading(self.PRICE_COLUMN, text=f"Price at {start_time}")
     
     def _parse_start_time(self):
         """Parse start time string and return as HH:MM format"""
@@ -1336,7 +2075,7 @@ class EarlySessionTab(BaseTab):
         except ValueError:
             pass
         # Default to 09:40 if parsing fails
-        messagebox.showwarning("Invalid Time", f"Invalid time format: {time_str}. Using default 09:40")
+        self.run_notices.append(f"invalid start time {time_str}, using 09:40")
         self.start_time_var.set("09:40")
         return "09:40"
     
@@ -1347,49 +2086,21 @@ class EarlySessionTab(BaseTab):
         """
         interval = self.app.interval_var.get().strip()
         if interval not in ("1m", "5m"):
-            messagebox.showwarning(
-                "Interval Adjusted",
-                "Early-Session analysis requires a 1m or 5m interval. "
-                "Switching interval to 1m.",
-            )
+            self.run_notices.append("Early Session needs 1m or 5m, using 1m")
             interval = "1m"
             self.app.interval_var.set(interval)
         return interval
 
     def run(self):
         """Run anchor analysis for the active symbol universe using dynamic start time."""
-        # Rebuild treeview with updated columns if start time changed
-        start_time = self.start_time_var.get()
-        current_price_col = self.columns[2] if len(self.columns) > 2 else ""
-        if f"Price at {start_time}" != current_price_col:
-            # Recreate treeview with new column names
-            self.tree.destroy()
-            self.columns = (
-                "Symbol",
-                "Date",
-                f"Price at {start_time}",
-                "Indication",
-                "Highest value",
-                "Lowest value",
-                "Direction",
-                "% Gain",
-                "Remarks",
-            )
-            self.tree = self.create_treeview(self.columns)
-            # Reapply styling
-            self.tree.tag_configure("dir_high", background="#dcfce7", foreground="#065f46")
-            self.tree.tag_configure("dir_low", background="#fee2e2", foreground="#991b1b")
-        
+        if self.is_running:
+            return
         # Use active_symbols if available, otherwise load from CSV
         symbols = self.app.active_symbols if self.app.active_symbols else self.universe.load_symbols()
         self._run_analysis(symbols)
 
     def _run_analysis(self, symbols):
         """Core analysis routine shared by normal and sample-test runs."""
-        self.tree.delete(*self.tree.get_children())
-        self.expanded_items.clear()
-        total_symbols = len(symbols)
-        
         if not symbols:
             messagebox.showwarning("No Symbols", "Please load symbols first")
             return
@@ -1397,94 +2108,44 @@ class EarlySessionTab(BaseTab):
         start_date, end_date = self.get_date_range()
         self.stored_data = {}
 
+        self.run_notices = []
         interval = self._validate_interval()
         start_time = self._parse_start_time()  # Get dynamic start time
+        # Relabel the existing tree instead of rebuilding it for a new start time
+        self._update_column_headers()
+        self.start_analysis(self._analyze, symbols, start_date, end_date, interval, start_time)
+        if self.run_notices:
+            self.progress_label.config(text="; ".join(self.run_notices), fg="#d97706")
+
+    def _analyze(self, symbols, start_date, end_date, interval, start_time):
+        """Worker thread: build per-day anchor records and post them per symbol"""
+        total_symbols = len(symbols)
+        # Fetch data using date range
+        frames = fetch_history_batch(symbols, start_date, end_date + timedelta(days=1), interval,
+                                     on_progress=self.post_progress)
         
-        for idx, sym in enumerate(symbols):
-            self.update_progress(idx, total_symbols)
+        for sym in symbols:
             try:
-                # Fetch data using date range
-                ticker = yf.Ticker(sym)
-                df = ticker.history(start=start_date, end=end_date + timedelta(days=1), interval=interval)
-                
-                if df.empty:
+                df = frames.get(sym)
+                if df is None:
                     continue
                 
-                df["date"] = df.index.date
-                daily_records = []
-                
-                for d, day_df in df.groupby("date"):
-                    # Filter for regular market hours (09:30 - 16:00)
-                    day_df = day_df.between_time("09:30", "16:00")
-
-                    if day_df.empty:
-                        continue
-
-                    # Anchor price at the user-defined start time
-                    anchor_bar = day_df.between_time(start_time, start_time)
-                    if anchor_bar.empty:
-                        # If start time bar is missing (e.g. data gaps), skip this day
-                        continue
-
-                    anchor_ts = anchor_bar.index[0]
-                    price_at_start = anchor_bar["Close"].iloc[0]
-
-                    # Post-start-time session (including the start time bar)
-                    post_df = day_df[day_df.index >= anchor_ts]
-                    if post_df.empty:
-                        continue
-
-                    post_high = post_df["High"].max()
-                    post_low = post_df["Low"].min()
-
-                    # Track timestamps for highest and lowest post-start-time values
-                    high_row = post_df[post_df["High"] == post_high].iloc[0]
-                    low_row = post_df[post_df["Low"] == post_low].iloc[0]
-                    high_time = high_row.name.strftime("%H:%M")
-                    low_time = low_row.name.strftime("%H:%M")
-
-                    # Dynamic selection logic:
-                    # If post-session high is above the start time price, treat the move as HIGH.
-                    # Otherwise, treat it as LOW, using the post-session low.
-                    if post_high > price_at_start:
-                        selected_price = post_high
-                        direction = "HIGH"
-                    else:
-                        selected_price = post_low
-                        direction = "LOW"
-
-                    pct_gain = (
-                        (selected_price - price_at_start) / price_at_start * 100 if price_at_start > 0 else 0
-                    )
-
-                    daily_records.append(
-                        {
-                            "date": d,
-                            "price_at_start": price_at_start,
-                            "post_high": post_high,
-                            "post_low": post_low,
-                            "selected_price": selected_price,
-                            "direction": direction,
-                            "high_time": high_time,
-                            "low_time": low_time,
-                            "pct_gain": pct_gain,
-                        }
-                    )
-                
+                daily_records = early_session_records(df, start_time)
                 if not daily_records:
                     continue
                 
-                # Store data for view mode switching
-                self.stored_data[sym] = daily_records
-
-                # Build UI rows for this symbol
-                self._add_symbol_rows(sym, daily_records)
+                # Summarise here so the Tk thread only formats rows
+                self.post_result(sym, daily_records, self._compute_summary(daily_records))
                 
             except Exception as e:
                 print(f"Error processing {sym}: {str(e)}")
         
-        self.update_progress(total_symbols, total_symbols)
-        self.reset_progress(success=True)
+        self.post_progress(total_symbols, total_symbols)
+
+    def render_result(self, sym, daily_records, summary):
+        """Store a symbol's records for view switching and build its rows"""
+        self.stored_data[sym] = daily_records
+        self._add_symbol_rows(sym, daily_records, summary)
 
     def _compute_summary(self, daily_records):
         """Compute aggregated metrics used for the collapsed/summary row."""
@@ -1492,9 +2153,9 @@ class EarlySessionTab(BaseTab):
         if n == 0:
             return None
 
-        avg_start = sum(r["price_at_start"] for r in daily_records) / n
-        avg_high = sum(r["post_high"] for r in daily_records) / n
-        avg_low = sum(r["post_low"] for r in daily_records) / n
+        # One pass over the records, then a single column-wise mean
+        prices = np.array([(r["price_at_start"], r["post_high"], r["post_low"]) for r in daily_records])
+        avg_start, avg_high, avg_low = prices.mean(axis=0).tolist()
 
         # Collapsed-row selection logic
         if avg_high > avg_start:
@@ -1518,12 +2179,11 @@ class EarlySessionTab(BaseTab):
             "days": n,
         }
 
-    def _add_symbol_rows(self, sym, daily_records):
+    def _add_symbol_rows(self, sym, daily_records, summary):
         """
         Add the parent (collapsed) row and all child (per-day) rows for a symbol,
         applying direction-based coloring.
         """
-        summary = self._compute_summary(daily_records)
         if summary is None:
             return
 
@@ -1540,13 +2200,9 @@ class EarlySessionTab(BaseTab):
             "",                                    # Remarks
         )
 
-        parent = self.add_parent_row(self.tree, parent_values)
-
-        # Apply collapsed-row color purely based on summary direction
-        if summary["summary_direction"] == "HIGH":
-            self.tree.item(parent, tags=("dir_high",))
-        else:
-            self.tree.item(parent, tags=("dir_low",))
+        # Collapsed-row color is purely based on summary direction
+        parent_tag = "dir_high" if summary["summary_direction"] == "HIGH" else "dir_low"
+        parent = self.add_parent_row(self.tree, parent_values, tags=(parent_tag,))
 
         # Detailed child rows (per trading day)
         for record in daily_records:
@@ -1567,13 +2223,9 @@ class EarlySessionTab(BaseTab):
                 remarks,                                            # Remarks (for average view)
             )
 
-            child = self.add_child_row(self.tree, parent, child_values)
-
-            # Apply per-row coloring based on the day-level selection
-            if record["direction"] == "HIGH":
-                self.tree.item(child, tags=("dir_high",))
-            else:
-                self.tree.item(child, tags=("dir_low",))
+            # Per-row coloring based on the day-level selection
+            child_tag = "dir_high" if record["direction"] == "HIGH" else "dir_low"
+            self.add_child_row(self.tree, parent, child_values, tags=(child_tag,))
     
     def toggle_view_mode(self):
         """Switch between detailed and average views by showing/hiding columns."""
@@ -1585,11 +2237,9 @@ class EarlySessionTab(BaseTab):
                 self.tree.column(col, width=0, stretch=False)
 
             # Key columns for average view
-            start_time = self.start_time_var.get()
-            price_col_name = f"Price at {start_time}"
             for col, width in [
                 ("Date", 120),
-                (price_col_name, 120),
+                (self.PRICE_COLUMN, 120),
                 ("Indication", 100),
                 ("% Gain", 90),
                 ("Remarks", 260),
@@ -1601,11 +2251,9 @@ class EarlySessionTab(BaseTab):
                 self.tree.item(parent, open=False)
         else:
             # Detailed view: show all analytical columns; remarks is optional.
-            start_time = self.start_time_var.get()
-            price_col_name = f"Price at {start_time}"
             for col, width in [
                 ("Date", 120),
-                (price_col_name, 120),
+                (self.PRICE_COLUMN, 120),
                 ("Indication", 90),
                 ("Highest value", 170),
                 ("Lowest value", 170),
@@ -1648,85 +2296,75 @@ class ReversalCycleTab(BaseTab):
         self.tree = self.create_treeview(("Symbol", "Total Cycles", "Avg Cycles/Day", "Daily Breakdown"))
 
     def run(self):
-        self.tree.delete(*self.tree.get_children())
-        self.expanded_items.clear()
+        if self.is_running:
+            return
         # Use active_symbols if available, otherwise load from CSV
         symbols = self.app.active_symbols if self.app.active_symbols else self.universe.load_symbols()
-        total_symbols = len(symbols)
         
         if not symbols:
             messagebox.showwarning("No Symbols", "Please load or select symbols first")
             return
         
+        # Read Tk variables here; the worker thread must not touch them
         start_date, end_date = self.get_date_range()
+        interval = self.app.interval_var.get().strip()
+        threshold = self.n_pct.get()
+        self.start_analysis(self._analyze, symbols, start_date, end_date, interval, threshold)
+
+    def _analyze(self, symbols, start_date, end_date, interval, threshold):
+        """Worker thread: count daily reversal cycles and post them per symbol"""
+        total_symbols = len(symbols)
+        frames = fetch_history_batch(symbols, start_date, end_date + timedelta(days=1), interval,
+                                     on_progress=self.post_progress)
         
-        for idx, sym in enumerate(symbols):
-            self.update_progress(idx, total_symbols)
+        for sym in symbols:
             try:
-                interval = self.app.interval_var.get().strip()
-                # Use date range instead of period
-                df = yf.Ticker(sym).history(start=start_date, end=end_date + timedelta(days=1), interval=interval)
-
-                if df.empty:
+                df = frames.get(sym)
+                if df is None:
                     continue
 
-                df["date"] = df.index.date
                 daily_cycles = []
                 
-                for date, day_df in df.groupby("date"):
-                    if len(day_df) < 2:
+                closes = price_array(df["Close"])
+                opens = price_array(df["Open"])
+                for day, start, end in zip(*day_bounds(df.index)):
+                    if end - start < 2:
                         continue
                     
-                    cycles = 0
-                    ref = day_df["Open"].iloc[0]
-                    direction = None
-
-                    for p in day_df["Close"]:
-                        pct_change = (p - ref) / ref * 100
-                        
-                        if direction is None:
-                            if pct_change >= self.n_pct.get():
-                                direction = "up"
-                                ref = p
-                            elif pct_change <= -self.n_pct.get():
-                                direction = "down"
-                                ref = p
-                        else:
-                            if direction == "up" and pct_change <= -self.n_pct.get():
-                                cycles += 1
-                                direction = None
-                                ref = p
-                            elif direction == "down" and pct_change >= self.n_pct.get():
-                                cycles += 1
-                                direction = None
-                                ref = p
-                    
-                    daily_cycles.append((date, cycles))
+                    cycles = count_cycles(closes[start:end], opens[start], threshold)
+                    daily_cycles.append((day.date(), cycles))
                 
                 if not daily_cycles:
                     continue
                 
-                # Calculate summary
-                total_cycles = sum(c[1] for c in daily_cycles)
-                avg_cycles = total_cycles / len(daily_cycles) if daily_cycles else 0
-                
-                # Add parent row with summary
-                parent = self.add_parent_row(self.tree, (sym, total_cycles, f"{avg_cycles:.2f}", f"{len(daily_cycles)} days"), 1, 5)
-                
-                # Add child rows with daily data
-                for date, cycles in daily_cycles:
-                    self.add_child_row(self.tree, parent, (f"  {date}", cycles, "", ""))
+                self.post_result(sym, daily_cycles)
                 
             except Exception as e:
                 print(f"Error processing {sym}: {str(e)}")
         
-        self.update_progress(total_symbols, total_symbols)
-        self.reset_progress(success=True)
+        self.post_progress(total_symbols, total_symbols)
+
+    def render_result(self, sym, daily_cycles):
+        """Add summary and per-day cycle rows for one symbol"""
+        # Calculate summary
+        total_cycles = sum(c[1] for c in daily_cycles)
+        avg_cycles = total_cycles / len(daily_cycles) if daily_cycles else 0
+        
+        # Add parent row with summary
+        parent = self.add_parent_row(self.tree, (sym, total_cycles, f"{avg_cycles:.2f}", f"{len(daily_cycles)} days"), 1, 5,
+                                     raw_val=total_cycles)
+        
+        # Add child rows with daily data
+        for date, cycles in daily_cycles:
+            self.add_child_row(self.tree, parent, (f"  {date}", cycles, "", ""))
 
 
 
 
 if __name__ == "__main__":
+    # Compile the numba kernels and import yfinance in the background while the window opens
+    Thread(target=warm_up_kernels, daemon=True).start()
+    Thread(target=load_yfinance, daemon=True).start()
     root = tk.Tk()
     app = StockAnalysisApp(root)
     root.mainloop()
\ No newline at end of file